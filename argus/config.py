@@ -56,6 +56,17 @@ CRISIS_COLORS = {
 OUTPUT_MAP_FILE = "crisis_map.html"
 DATA_CACHE_FILE = "crisis_data.json"
 
+# Cache settings
+# Conditional-GET validators and parsed entries per RSS feed, kept across runs
+FEED_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".argus", "feed_cache.json")
+# Bump when the cached entry fields change to discard old caches
+FEED_CACHE_VERSION = 1
+# Successful geocoding results per normalized place name, kept across runs
+GEOCODING_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".argus", "geocoding_cache.json")
+GEOCODING_CACHE_MAX_AGE_DAYS = 30
+# Bump when the stored result format changes to discard old caches
+GEOCODING_CACHE_VERSION = 1
+
 # Processing limits
 MAX_ARTICLES_TO_PROCESS = 100
 MIN_ARTICLE_LENGTH = 100  # Minimum characters for processing
@@ -10,7 +10,8 @@ and categorizes sources (NGO vs media) for transparency.
 
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from collections import defaultdict
 from typing import List, Dict, Optional
 from pathlib import Path
@@ -213,7 +214,8 @@ def aggregate_by_country(crisis_articles: List[Dict]) -> List[Dict]:
         'incidents': [],
         'categories': defaultdict(int),
         'sources': set(),
-        'latest_date': None
+        'latest_date': None,
+        'latest_timestamp': 0
     })
     
     for result in crisis_articles:
@@ -230,6 +232,9 @@ def aggregate_by_country(crisis_articles: List[Dict]) -> List[Dict]:
         url = article.get('url', '')
         source_name = article.get('source_name', article.get('source', 'Unknown'))
         published = article.get('published_date', '')
+        # Numeric timestamp for chronological ordering (raw RSS date strings
+        # such as "Tue, 05 Nov 2024 ..." do not sort by time)
+        published_ts = article.get('published_timestamp') or 0
         
         # Parse published date
         published_iso = None
@@ -237,27 +242,29 @@ def aggregate_by_country(crisis_articles: List[Dict]) -> List[Dict]:
             if isinstance(published, str) and len(published) == 14:
                 pub_date = datetime.strptime(published[:8], '%Y%m%d')
                 published_iso = pub_date.isoformat() + 'Z'
+                published_ts = published_ts or pub_date.replace(tzinfo=timezone.utc).timestamp()
             elif isinstance(published, str):
                 published_iso = published
         except:
             pass
         
-        # Add to country data
-        country_data[country]['incidents'].append({
+        # Add to country data, keyed by timestamp for sorting
+        country_data[country]['incidents'].append((published_ts, {
             'title': title,
             'url': url,
             'source': source_name,
             'category': category,
             'published': published_iso or datetime.now().isoformat() + 'Z'
-        })
+        }))
         
         country_data[country]['categories'][category] += 1
         country_data[country]['sources'].add(source_name)
         
         # Track latest date
         if published_iso:
-            if not country_data[country]['latest_date'] or published_iso > country_data[country]['latest_date']:
+            if not country_data[country]['latest_date'] or published_ts > country_data[country]['latest_timestamp']:
                 country_data[country]['latest_date'] = published_iso
+                country_data[country]['latest_timestamp'] = published_ts
     
     # Convert to list format
     by_country = []
@@ -269,9 +276,9 @@ def aggregate_by_country(crisis_articles: List[Dict]) -> List[Dict]:
         lat, lon = get_country_coordinates(country)
         
         # Sort items by date (most recent first)
-        sorted_items = sorted(data['incidents'], 
-                            key=lambda x: x['published'], 
-                            reverse=True)
+        sorted_items = [item for _, item in sorted(data['incidents'],
+                                                   key=itemgetter(0),
+                                                   reverse=True)]
         
         by_country.append({
             'country': country,
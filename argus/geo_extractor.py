@@ -6,34 +6,64 @@ to latitude/longitude coordinates.
 """
 
 import logging
+import heapq
 import spacy
 from typing import List, Dict, Tuple, Optional, Set
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 import time
 import re
+from operator import itemgetter
 import os
+import json
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import quote
 import ssl
 import certifi
-from .config import SPACY_MODEL, GEOCODING_TIMEOUT, MAX_LOCATIONS_PER_ARTICLE
+from .config import (
+    SPACY_MODEL, GEOCODING_TIMEOUT, MAX_LOCATIONS_PER_ARTICLE,
+    GEOCODING_CACHE_FILE, GEOCODING_CACHE_MAX_AGE_DAYS, GEOCODING_CACHE_VERSION
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Compiled once; used for every extracted entity
+_WS_RE = re.compile(r'\s+')
+_LETTER_RE = re.compile(r'[a-zA-Z]')
+
+# Pipeline components that only feed tagging, parsing and lemmas; NER does
+# not read their output, so they are switched off after loading
+_UNUSED_PIPES = ('tagger', 'parser', 'attribute_ruler', 'lemmatizer')
+
+# Articles per spaCy batch in process_batch_locations
+NER_BATCH_SIZE = 32
+
+# Entity texts spaCy sometimes tags as places that are never geocodable
+NON_GEOGRAPHIC_TERMS = frozenset({
+    'today', 'yesterday', 'tomorrow', 'monday', 'tuesday', 'wednesday',
+    'thursday', 'friday', 'saturday', 'sunday', 'january', 'february',
+    'march', 'april', 'may', 'june', 'july', 'august', 'september',
+    'october', 'november', 'december', 'am', 'pm', 'news', 'report',
+    'article', 'story', 'breaking', 'update'
+})
+
 
 class GeographicExtractor:
     """Extracts and geocodes geographic entities from text"""
     
-    def __init__(self, spacy_model: str = None):
+    def __init__(self, spacy_model: str = None,
+                 cache_file: Optional[str] = GEOCODING_CACHE_FILE):
         """
         Initialize the geographic extractor
         
         Args:
             spacy_model: Name of the spaCy model to use
+            cache_file: Where geocoding results persist between runs (None disables)
         """
         self.model_name = spacy_model or SPACY_MODEL
         self.nlp = None
@@ -54,17 +84,84 @@ class GeographicExtractor:
         self.mapbox_token = os.getenv("MAPBOX_TOKEN")
         self.mapbox_endpoint = "https://api.mapbox.com/geocoding/v5/mapbox.places/"
         
-        # Cache for geocoding results to avoid repeated API calls
-        self.geocoding_cache = {}
+        # Keep-alive session for Mapbox lookups so fallback calls reuse one
+        # TLS connection instead of opening a new one per location
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            max_retries=Retry(total=2, backoff_factor=0.3,
+                              status_forcelist=(429, 500, 502, 503, 504))
+        ))
+        
+        # Cache for geocoding results to avoid repeated API calls, seeded
+        # from previous runs
+        self.cache_file = cache_file
+        self._cached_at = {}  # cache key -> time the result was first stored
+        self.geocoding_cache = self._load_geocoding_cache()
         
         logger.info(f"Initializing GeographicExtractor with model: {self.model_name}")
         self._load_model()
     
+    def _load_geocoding_cache(self) -> Dict:
+        """
+        Load the persisted geocoding cache, starting empty if missing or unreadable
+        
+        Entries older than GEOCODING_CACHE_MAX_AGE_DAYS, or written by a
+        different cache version, are dropped so stale coordinates get
+        looked up again.
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable geocoding cache {self.cache_file}: {e}")
+            return {}
+        
+        if data.get('version') != GEOCODING_CACHE_VERSION:
+            logger.info("Ignoring geocoding cache written by a different version")
+            return {}
+        
+        cutoff = time.time() - GEOCODING_CACHE_MAX_AGE_DAYS * 86400
+        cache = {}
+        for key, entry in data.get('entries', {}).items():
+            if entry.get('cached_at', 0) >= cutoff and entry.get('result'):
+                cache[key] = entry['result']
+                self._cached_at[key] = entry['cached_at']
+        logger.info(f"Loaded {len(cache)} cached geocoding results")
+        return cache
+    
+    def _save_geocoding_cache(self):
+        """
+        Persist the geocoding cache atomically as JSON
+        
+        Negative results are kept in memory only: they also cover timeouts
+        and service errors, which should be retried on the next run.
+        """
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            now = time.time()
+            entries = {
+                key: {'cached_at': self._cached_at.setdefault(key, now), 'result': result}
+                for key, result in self.geocoding_cache.items() if result is not None
+            }
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': GEOCODING_CACHE_VERSION, 'entries': entries}, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"Could not save geocoding cache {self.cache_file}: {e}")
+    
     def _load_model(self):
         """Load the spaCy NLP model"""
         try:
             logger.info("Loading spaCy model...")
             self.nlp = spacy.load(self.model_name)
+            self.nlp.select_pipes(disable=[
+                name for name in _UNUSED_PIPES if name in self.nlp.pipe_names
+            ])
             logger.info("spaCy model loaded successfully")
             
         except OSError as e:
@@ -91,7 +188,23 @@ class GeographicExtractor:
         try:
             # Process text with spaCy
             doc = self.nlp(text)
+        except Exception as e:
+            logger.error(f"Error extracting locations: {e}")
+            return []
+        
+        return self._locations_from_doc(doc)
+    
+    def _locations_from_doc(self, doc) -> List[Dict]:
+        """
+        Collect cleaned, de-duplicated geographic entities from a parsed doc
+        
+        Args:
+            doc: spaCy Doc for the article text
             
+        Returns:
+            List of location dictionaries with entity info
+        """
+        try:
             locations = []
             seen_locations = set()  # Avoid duplicates
             
@@ -144,7 +257,7 @@ class GeographicExtractor:
             return None
         
         # Remove extra whitespace
-        cleaned = re.sub(r'\s+', ' ', location_text.strip())
+        cleaned = _WS_RE.sub(' ', location_text.strip())
         
         # Remove common prefixes/suffixes that aren't part of location names
         prefixes_to_remove = ['the ', 'The ']
@@ -153,19 +266,11 @@ class GeographicExtractor:
                 cleaned = cleaned[len(prefix):]
         
         # Filter out obviously non-geographic terms
-        non_geographic_terms = {
-            'today', 'yesterday', 'tomorrow', 'monday', 'tuesday', 'wednesday',
-            'thursday', 'friday', 'saturday', 'sunday', 'january', 'february',
-            'march', 'april', 'may', 'june', 'july', 'august', 'september',
-            'october', 'november', 'december', 'am', 'pm', 'news', 'report',
-            'article', 'story', 'breaking', 'update'
-        }
-        
-        if cleaned.lower() in non_geographic_terms:
+        if cleaned.lower() in NON_GEOGRAPHIC_TERMS:
             return None
         
         # Must be at least 2 characters and contain letters
-        if len(cleaned) < 2 or not re.search(r'[a-zA-Z]', cleaned):
+        if len(cleaned) < 2 or not _LETTER_RE.search(cleaned):
             return None
         
         return cleaned
@@ -180,11 +285,6 @@ class GeographicExtractor:
         Returns:
             Dictionary with geocoding results or None if failed
         """
-        # Check cache first
-        cache_key = location_text.lower().strip()
-        if cache_key in self.geocoding_cache:
-            return self.geocoding_cache[cache_key]
-        
         # Known crisis zones that should override geocoding (to avoid ambiguous matches)
         known_crisis_zones = {
             'gaza': {'lat': 31.3547, 'lon': 34.3088, 'name': 'Gaza Strip, Palestine'},
@@ -207,19 +307,22 @@ class GeographicExtractor:
             'china': {'lat': 35.8617, 'lon': 104.1954, 'name': 'China'},
         }
         
-        # Check if this is a known crisis zone
-        location_lower = location_text.lower().strip()
-        if location_lower in known_crisis_zones:
-            zone = known_crisis_zones[location_lower]
-            result = {
+        # Check if this is a known crisis zone; these always win over cached
+        # lookups and are not cached themselves
+        cache_key = location_text.lower().strip()
+        if cache_key in known_crisis_zones:
+            zone = known_crisis_zones[cache_key]
+            return {
                 'query': location_text,
                 'found_name': zone['name'],
                 'latitude': zone['lat'],
                 'longitude': zone['lon'],
                 'raw_data': {'source': 'known_crisis_zone'}
             }
-            self.geocoding_cache[cache_key] = result
-            return result
+        
+        # Check cache next
+        if cache_key in self.geocoding_cache:
+            return self.geocoding_cache[cache_key]
         
         try:
             # Add rate limiting to avoid overwhelming the geocoding service
@@ -241,7 +344,9 @@ class GeographicExtractor:
                     'found_name': location.address,
                     'latitude': location.latitude,
                     'longitude': location.longitude,
-                    'raw_data': location.raw
+                    # Only record provenance; the full provider payload is
+                    # never read downstream and is carried by every article
+                    'raw_data': {'source': 'nominatim'}
                 }
                 # Cache and return
                 self.geocoding_cache[cache_key] = result
@@ -257,7 +362,7 @@ class GeographicExtractor:
                         'limit': 1,
                         'language': 'en'
                     }
-                    resp = requests.get(url, params=params, timeout=10)
+                    resp = self.session.get(url, params=params, timeout=(5, 10))
                     if resp.ok:
                         data = resp.json()
                         features = data.get('features', [])
@@ -270,7 +375,7 @@ class GeographicExtractor:
                                     'found_name': place_name,
                                     'latitude': center[1],
                                     'longitude': center[0],
-                                    'raw_data': features[0]
+                                    'raw_data': {'source': 'mapbox'}
                                 }
                                 self.geocoding_cache[cache_key] = result
                                 return result
@@ -285,24 +390,32 @@ class GeographicExtractor:
             logger.error(f"Unexpected geocoding error for '{location_text}': {e}")
             return None
     
-    def process_article_locations(self, article: Dict) -> Dict:
+    @staticmethod
+    def _article_text(article: Dict) -> str:
+        """Combine title and content for location extraction"""
+        title = article.get('title', '')
+        content = article.get('content', '')
+        return f"{title}. {content}".strip()
+    
+    def process_article_locations(self, article: Dict, doc=None) -> Dict:
         """
         Extract and geocode all locations from an article
         
         Args:
             article: Article dictionary with text content
+            doc: Optional spaCy Doc already parsed from the article text
             
         Returns:
             Article dictionary enhanced with location data
         """
         try:
-            # Combine title and content for location extraction
-            title = article.get('title', '')
-            content = article.get('content', '')
-            full_text = f"{title}. {content}".strip()
+            full_text = self._article_text(article)
             
             # Extract locations using NER
-            extracted_locations = self.extract_locations(full_text)
+            if doc is not None:
+                extracted_locations = self._locations_from_doc(doc)
+            else:
+                extracted_locations = self.extract_locations(full_text)
 
             # Fallback: infer from crisis keywords if NER missed it (systemic regions)
             if not extracted_locations:
@@ -383,14 +496,26 @@ class GeographicExtractor:
         
         logger.info(f"Processing locations for {total_articles} articles")
         
-        for i, article in enumerate(articles):
-            enhanced_article = self.process_article_locations(article)
+        # Run NER over the whole batch with nlp.pipe, which is much faster
+        # than one nlp() call per article; on failure, fall back to per-article
+        docs = [None] * total_articles
+        if self.nlp and articles:
+            try:
+                texts = [self._article_text(article) for article in articles]
+                docs = list(self.nlp.pipe(texts, batch_size=NER_BATCH_SIZE))
+            except Exception as e:
+                logger.warning(f"Batched NER failed, processing articles one by one: {e}")
+        
+        for i, (article, doc) in enumerate(zip(articles, docs)):
+            enhanced_article = self.process_article_locations(article, doc)
             enhanced_articles.append(enhanced_article)
             
             # Log progress
             if (i + 1) % 10 == 0 or i + 1 == total_articles:
                 logger.info(f"Processed locations for {i + 1}/{total_articles} articles")
         
+        self._save_geocoding_cache()
+        
         return enhanced_articles
     
     def get_location_statistics(self, articles: List[Dict]) -> Dict:
@@ -438,8 +563,8 @@ class GeographicExtractor:
         del stats['unique_locations']  # Remove set for JSON serialization
         
         # Sort top locations
-        stats['top_locations'] = dict(sorted(stats['top_locations'].items(), 
-                                           key=lambda x: x[1], reverse=True)[:10])
+        stats['top_locations'] = dict(heapq.nlargest(10, stats['top_locations'].items(),
+                                                     key=itemgetter(1)))
         
         return stats
 
@@ -0,0 +1,85 @@
+"""
+Keyword Matching Module
+
+Multi-pattern substring matching backed by an Aho-Corasick automaton, so a
+whole keyword list is checked against a text in a single linear scan instead
+of one substring search per keyword.
+"""
+
+import ahocorasick
+from typing import Dict, Iterable, Optional, Set
+
+
+class KeywordMatcher:
+    """
+    Matches a fixed set of keywords against lowercase text
+
+    Semantics are the same as ``any(kw in text for kw in keywords)``: keywords
+    match anywhere as plain substrings, overlapping matches included.
+
+    Keywords can also be grouped under labels (e.g. one group per category),
+    in which case a single scan reports which groups fired.
+    """
+
+    def __init__(self, keywords: Iterable[str] = (),
+                 groups: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Build the automaton
+
+        Args:
+            keywords: Unlabeled keywords to match (lowercased, duplicates dropped)
+            groups: Optional mapping of label -> keywords; a keyword may
+                belong to several groups
+        """
+        keyword_labels = {}
+        for keyword in keywords:
+            keyword_labels.setdefault(keyword.lower(), set())
+        for label, group_keywords in (groups or {}).items():
+            for keyword in group_keywords:
+                keyword_labels.setdefault(keyword.lower(), set()).add(label)
+
+        self.keywords = tuple(keyword_labels)
+        self._automaton = ahocorasick.Automaton()
+
+        for keyword, labels in keyword_labels.items():
+            self._automaton.add_word(keyword, (keyword, frozenset(labels)))
+
+        if self.keywords:
+            self._automaton.make_automaton()
+
+    def search(self, text: str) -> bool:
+        """Return True if any keyword occurs in text"""
+        if not self.keywords:
+            return False
+
+        for _ in self._automaton.iter(text):
+            return True
+        return False
+
+    def matches(self, text: str) -> Set[str]:
+        """Return the set of distinct keywords that occur in text"""
+        if not self.keywords:
+            return set()
+
+        return {keyword for _, (keyword, _) in self._automaton.iter(text)}
+
+    def labels(self, text: str) -> Set[str]:
+        """Return the set of group labels with at least one keyword in text"""
+        if not self.keywords:
+            return set()
+
+        found = set()
+        for _, (_, labels) in self._automaton.iter(text):
+            found |= labels
+        return found
+
+    def matches_by_label(self, text: str) -> Dict[str, Set[str]]:
+        """Return label -> distinct keywords of that group that occur in text"""
+        if not self.keywords:
+            return {}
+
+        found = {}
+        for _, (keyword, labels) in self._automaton.iter(text):
+            for label in labels:
+                found.setdefault(label, set()).add(keyword)
+        return found
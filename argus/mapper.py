@@ -19,6 +19,332 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Static parts of the sidebar injected by CrisisMapper._add_filter_panel.
+# Kept as plain module-level strings so only the dynamic header and JSON
+# payloads are formatted per map.
+_SIDEBAR_STYLE = """
+        <style>
+            /* Reset and base styles */
+            * {
+                box-sizing: border-box;
+            }
+            
+            /* Sidebar container */
+            .crisis-sidebar {
+                position: fixed;
+                left: 0;
+                top: 0;
+                bottom: 0;
+                width: 240px;
+                background: white;
+                border-right: 1px solid #ddd;
+                display: flex;
+                flex-direction: column;
+                z-index: 1000;
+                font-family: "Computer Modern Serif", Georgia, "Times New Roman", serif;
+            }
+            
+            /* Header */
+            .sidebar-header {
+                padding: 12px 16px;
+                border-bottom: 1px solid #ddd;
+                background: #f8f9fa;
+            }
+            
+            .sidebar-title {
+                font-size: 13px;
+                font-weight: bold;
+                color: #333;
+                margin: 0 0 4px 0;
+                letter-spacing: 0.3px;
+            }
+            
+            .sidebar-stats {
+                font-size: 10px;
+                color: #666;
+                margin: 0;
+            }
+
+            /* window selector removed (fixed to 7 days) */
+            
+            /* Content area */
+            .sidebar-content {
+                flex: 1;
+                overflow-y: auto;
+                padding: 16px;
+                display: flex;
+                flex-direction: column;
+            }
+            
+            /* Chat interface */
+            .chat-messages {
+                height: calc(100vh - 300px);
+                overflow-y: auto;
+                margin-bottom: 12px;
+                padding: 8px;
+                background: #f8f9fa;
+                border-radius: 2px;
+                border: 0.5px solid #ddd;
+            }
+            
+            .chat-message {
+                margin-bottom: 12px;
+                padding: 8px 10px;
+                border-radius: 4px;
+                font-size: 11px;
+                line-height: 1.5;
+            }
+            
+            .chat-message.user {
+                background: #e3f2fd;
+                color: #1565c0;
+                margin-left: 20px;
+            }
+            
+            .chat-message.bot {
+                background: white;
+                border: 0.5px solid #ddd;
+                color: #333;
+                margin-right: 20px;
+            }
+            
+            .chat-message.bot .sources {
+                margin-top: 8px;
+                padding-top: 8px;
+                border-top: 0.5px solid #ddd;
+                font-size: 9px;
+                color: #666;
+            }
+            
+            .chat-input-container {
+                display: flex;
+                gap: 8px;
+            }
+            
+            .chat-input {
+                flex: 1;
+                padding: 8px;
+                border: 0.5px solid #666;
+                border-radius: 2px;
+                font-size: 11px;
+                font-family: "Computer Modern Serif", Georgia, "Times New Roman", serif;
+            }
+            
+            .chat-send-btn {
+                padding: 8px 16px;
+                background: #333;
+                color: white;
+                border: none;
+                border-radius: 2px;
+                cursor: pointer;
+                font-size: 11px;
+                font-family: "Computer Modern Serif", Georgia, "Times New Roman", serif;
+                transition: background 0.2s;
+            }
+            
+            .chat-send-btn:hover {
+                background: #000;
+            }
+            
+            .chat-send-btn:disabled {
+                background: #ccc;
+                cursor: not-allowed;
+            }
+            
+            
+            /* Adjust map to make room for sidebar */
+            .folium-map {
+                margin-left: 240px !important;
+            }
+        </style>
+        """
+
+_SIDEBAR_SCRIPT = """
+            
+            // Get reference to Leaflet map
+            let mapInstance = null;
+            setTimeout(() => {
+                // Find the map instance (Folium creates it with a specific pattern)
+                const mapElements = document.querySelectorAll('[id^="map_"]');
+                if (mapElements.length > 0) {
+                    const mapId = mapElements[0].id;
+                    mapInstance = window[mapId];
+                    try {
+                        // Clamp panning and disable world wrapping at runtime
+                        if (mapInstance && mapInstance.setMaxBounds) {
+                            mapInstance.setMaxBounds([[-85, -180], [85, 180]]);
+                        }
+                        if (mapInstance && mapInstance.options) {
+                            mapInstance.options.worldCopyJump = false;
+                            mapInstance.options.maxBoundsViscosity = 1.0;
+                        }
+                    } catch (e) {}
+                }
+            }, 1000);
+
+            // Data window fixed to 7 days; selector removed
+
+            // --- Search helpers ---
+            function normalizeText(s) {
+                try {
+                    return (s || '')
+                        .toString()
+                        .toLowerCase()
+                        .normalize('NFD')
+                        .replace(/[\u0300-\u036f]/g, '')  // strip diacritics
+                        .replace(/[^a-z0-9 ,\-]/g, ' ')    // drop punctuation except comma/hyphen
+                        .replace(/\s+/g, ' ')              // collapse spaces
+                        .trim();
+                } catch {
+                    return (s || '').toString().toLowerCase().trim();
+                }
+            }
+
+            const aliasMap = {
+                'us': 'united states',
+                'u s': 'united states',
+                'usa': 'united states',
+                'u.s.': 'united states',
+                'u.s': 'united states',
+                'uk': 'united kingdom',
+                'uae': 'united arab emirates',
+                'drc': 'democratic republic of the congo',
+                'dr congo': 'democratic republic of the congo',
+                'gaza': 'gaza strip',
+                'nyc': 'new york'
+            };
+            
+            // Chat functionality
+            async function sendMessage() {
+                const input = document.getElementById('chatInput');
+                const message = input.value.trim();
+                if (!message) return;
+                
+                const messagesDiv = document.getElementById('chatMessages');
+                
+                // Add user message
+                const userMsg = document.createElement('div');
+                userMsg.className = 'chat-message user';
+                userMsg.textContent = message;
+                messagesDiv.appendChild(userMsg);
+                messagesDiv.scrollTop = messagesDiv.scrollHeight;
+                
+                input.value = '';
+                
+                // Show thinking indicator
+                const thinkingMsg = document.createElement('div');
+                thinkingMsg.className = 'chat-message bot';
+                thinkingMsg.innerHTML = '<em>Thinking...</em>';
+                messagesDiv.appendChild(thinkingMsg);
+                messagesDiv.scrollTop = messagesDiv.scrollHeight;
+                
+                // Get response using smart keyword search
+                const answer = processQuery(message);
+                
+                // Replace thinking with actual response
+                thinkingMsg.innerHTML = answer;
+                messagesDiv.scrollTop = messagesDiv.scrollHeight;
+            }
+            
+            function processQuery(query) {
+                const q = query.toLowerCase().trim();
+                
+                // Statistics queries
+                if (q.includes('how many') || q.includes('total') || q.includes('count') || q.includes('stats')) {
+                    let stats = `<strong>${searchIndex.length} crisis locations tracked</strong>:<br><br>`;
+                    Object.entries(categoryCounts).forEach(([cat, count]) => {
+                        stats += `<strong>${cat}:</strong> ${count} locations<br>`;
+                    });
+                    return stats;
+                }
+                
+                // List all
+                if (q.includes('list') || q === 'all' || q.includes('show all')) {
+                    let html = '<strong>Top crisis locations:</strong><br><br>';
+                    searchIndex.slice(0, 10).forEach((item, i) => {
+                        html += `${i+1}. <strong>${item.location}</strong><br>`;
+                        html += `   ${item.category} (${item.count} incidents)<br>`;
+                    });
+                    if (searchIndex.length > 10) {
+                        html += `<br><em>+ ${searchIndex.length - 10} more locations</em>`;
+                    }
+                    return html;
+                }
+                
+                // Search for location or category
+                let searchTerm = q.replace(/^(show me|show|find|search|where is|what about|tell me about|whats in|what's in|what is happening in|what's happening in|whats happening in|what is going on in|what's going on in)\s+/i, '').trim();
+                let normalized = normalizeText(searchTerm);
+                // If user asked "... in X" or "... about X", grab X
+                const inIdx = normalized.lastIndexOf(' in ');
+                const aboutIdx = normalized.lastIndexOf(' about ');
+                const splitIdx = Math.max(inIdx, aboutIdx);
+                if (splitIdx > -1) {
+                    normalized = normalized.substring(splitIdx + (inIdx > aboutIdx ? 4 : 7));
+                }
+                // Trim trailing noise
+                normalized = normalized.replace(/\b(now|today|currently)\b$/,'').trim();
+                // Remove any trailing punctuation
+                normalized = normalized.replace(/[^a-z0-9 \-,]/gi, '').trim();
+                if (aliasMap[normalized]) {
+                    normalized = aliasMap[normalized];
+                }
+                // Try location match first
+                const locationMatches = searchIndex.filter(item =>
+                    normalizeText(item.location).includes(normalized)
+                );
+                
+                if (locationMatches.length > 0) {
+                    const loc = locationMatches[0];
+                    if (mapInstance) {
+                        mapInstance.setView([loc.lat, loc.lon], 8);
+                    }
+                    let response = `<strong>${loc.location}</strong><br><br>`;
+                    response += `Category: ${loc.category}<br>`;
+                    response += `Incidents: ${loc.count}<br><br>`;
+                    response += `<em>Map zoomed to location</em>`;
+                    
+                    if (locationMatches.length > 1) {
+                        response += `<br><br>Other matches: `;
+                        response += locationMatches.slice(1, 4).map(m => m.location.split(',')[0]).join(', ');
+                    }
+                    return response;
+                }
+
+                // Try category match
+                const categoryMatches = searchIndex.filter(item =>
+                    normalizeText(item.category).includes(normalized)
+                );
+                if (categoryMatches.length > 0) {
+                    let html = `<strong>Found ${categoryMatches.length} ${categoryMatches[0].category} locations:</strong><br><br>`;
+                    categoryMatches.slice(0, 8).forEach((item, i) => {
+                        html += `${i+1}. ${item.location} (${item.count} incidents)<br>`;
+                    });
+                    if (categoryMatches.length > 8) {
+                        html += `<br><em>+ ${categoryMatches.length - 8} more</em>`;
+                    }
+                    return html;
+                }
+                
+                // No matches
+                const examples = [
+                    searchIndex[0].location.split(',')[0],
+                    'humanitarian',
+                    'how many total',
+                    'list all'
+                ];
+                return `No results found for "${query}"<br><br>Try: "${examples.join('", "')}"`;
+            }
+            
+            
+            function zoomToLocation(lat, lon) {
+                if (mapInstance) {
+                    mapInstance.setView([lat, lon], 8);
+                }
+            }
+        </script>
+        """
+
+
 class CrisisMapper:
     """Creates interactive maps for crisis visualization"""
     
@@ -835,9 +1161,6 @@ class CrisisMapper:
         - Search: Real-time location/category filtering
         - Filter: Visual category toggles
         """
-        with open(html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
         # Count categories from crisis data and build searchable index
         category_counts = {}
         search_index = []
@@ -909,151 +1232,13 @@ class CrisisMapper:
             category_colors_hex[category] = hex_color
         
         # Generate JavaScript objects
-        import json
         categories_js = json.dumps(category_counts)
         colors_js = json.dumps(category_colors_hex)
         search_index_js = json.dumps(search_index)
         
-        # No external API needed - pure client-side search
-        import os
-        
-        # Create unified sidebar UI
-        sidebar_ui = f"""
-        <style>
-            /* Reset and base styles */
-            * {{
-                box-sizing: border-box;
-            }}
-            
-            /* Sidebar container */
-            .crisis-sidebar {{
-                position: fixed;
-                left: 0;
-                top: 0;
-                bottom: 0;
-                width: 240px;
-                background: white;
-                border-right: 1px solid #ddd;
-                display: flex;
-                flex-direction: column;
-                z-index: 1000;
-                font-family: "Computer Modern Serif", Georgia, "Times New Roman", serif;
-            }}
-            
-            /* Header */
-            .sidebar-header {{
-                padding: 12px 16px;
-                border-bottom: 1px solid #ddd;
-                background: #f8f9fa;
-            }}
-            
-            .sidebar-title {{
-                font-size: 13px;
-                font-weight: bold;
-                color: #333;
-                margin: 0 0 4px 0;
-                letter-spacing: 0.3px;
-            }}
-            
-            .sidebar-stats {{
-                font-size: 10px;
-                color: #666;
-                margin: 0;
-            }}
-
-            /* window selector removed (fixed to 7 days) */
-            
-            /* Content area */
-            .sidebar-content {{
-                flex: 1;
-                overflow-y: auto;
-                padding: 16px;
-                display: flex;
-                flex-direction: column;
-            }}
-            
-            /* Chat interface */
-            .chat-messages {{
-                height: calc(100vh - 300px);
-                overflow-y: auto;
-                margin-bottom: 12px;
-                padding: 8px;
-                background: #f8f9fa;
-                border-radius: 2px;
-                border: 0.5px solid #ddd;
-            }}
-            
-            .chat-message {{
-                margin-bottom: 12px;
-                padding: 8px 10px;
-                border-radius: 4px;
-                font-size: 11px;
-                line-height: 1.5;
-            }}
-            
-            .chat-message.user {{
-                background: #e3f2fd;
-                color: #1565c0;
-                margin-left: 20px;
-            }}
-            
-            .chat-message.bot {{
-                background: white;
-                border: 0.5px solid #ddd;
-                color: #333;
-                margin-right: 20px;
-            }}
-            
-            .chat-message.bot .sources {{
-                margin-top: 8px;
-                padding-top: 8px;
-                border-top: 0.5px solid #ddd;
-                font-size: 9px;
-                color: #666;
-            }}
-            
-            .chat-input-container {{
-                display: flex;
-                gap: 8px;
-            }}
-            
-            .chat-input {{
-                flex: 1;
-                padding: 8px;
-                border: 0.5px solid #666;
-                border-radius: 2px;
-                font-size: 11px;
-                font-family: "Computer Modern Serif", Georgia, "Times New Roman", serif;
-            }}
-            
-            .chat-send-btn {{
-                padding: 8px 16px;
-                background: #333;
-                color: white;
-                border: none;
-                border-radius: 2px;
-                cursor: pointer;
-                font-size: 11px;
-                font-family: "Computer Modern Serif", Georgia, "Times New Roman", serif;
-                transition: background 0.2s;
-            }}
-            
-            .chat-send-btn:hover {{
-                background: #000;
-            }}
-            
-            .chat-send-btn:disabled {{
-                background: #ccc;
-                cursor: not-allowed;
-            }}
-            
-            
-            /* Adjust map to make room for sidebar */
-            .folium-map {{
-                margin-left: 240px !important;
-            }}
-        </style>
-        
+        # Only the header stats and the JSON payloads vary between runs; the
+        # static CSS and script bodies are module-level constants
+        sidebar_ui = _SIDEBAR_STYLE + f"""
         <!-- Unified Sidebar -->
         <div class="crisis-sidebar">
             <!-- Header -->
@@ -1083,192 +1268,12 @@ class CrisisMapper:
             // Data from Python
             const categoryCounts = {categories_js};
             const categoryColors = {colors_js};
-            const searchIndex = {search_index_js};
-            
-            // Get reference to Leaflet map
-            let mapInstance = null;
-            setTimeout(() => {{
-                // Find the map instance (Folium creates it with a specific pattern)
-                const mapElements = document.querySelectorAll('[id^="map_"]');
-                if (mapElements.length > 0) {{
-                    const mapId = mapElements[0].id;
-                    mapInstance = window[mapId];
-                    try {{
-                        // Clamp panning and disable world wrapping at runtime
-                        if (mapInstance && mapInstance.setMaxBounds) {{
-                            mapInstance.setMaxBounds([[-85, -180], [85, 180]]);
-                        }}
-                        if (mapInstance && mapInstance.options) {{
-                            mapInstance.options.worldCopyJump = false;
-                            mapInstance.options.maxBoundsViscosity = 1.0;
-                        }}
-                    }} catch (e) {{}}
-                }}
-            }}, 1000);
-
-            // Data window fixed to 7 days; selector removed
-
-            // --- Search helpers ---
-            function normalizeText(s) {{
-                try {{
-                    return (s || '')
-                        .toString()
-                        .toLowerCase()
-                        .normalize('NFD')
-                        .replace(/[\u0300-\u036f]/g, '')  // strip diacritics
-                        .replace(/[^a-z0-9 ,\-]/g, ' ')    // drop punctuation except comma/hyphen
-                        .replace(/\s+/g, ' ')              // collapse spaces
-                        .trim();
-                }} catch {{
-                    return (s || '').toString().toLowerCase().trim();
-                }}
-            }}
-
-            const aliasMap = {{
-                'us': 'united states',
-                'u s': 'united states',
-                'usa': 'united states',
-                'u.s.': 'united states',
-                'u.s': 'united states',
-                'uk': 'united kingdom',
-                'uae': 'united arab emirates',
-                'drc': 'democratic republic of the congo',
-                'dr congo': 'democratic republic of the congo',
-                'gaza': 'gaza strip',
-                'nyc': 'new york'
-            }};
-            
-            // Chat functionality
-            async function sendMessage() {{
-                const input = document.getElementById('chatInput');
-                const message = input.value.trim();
-                if (!message) return;
-                
-                const messagesDiv = document.getElementById('chatMessages');
-                
-                // Add user message
-                const userMsg = document.createElement('div');
-                userMsg.className = 'chat-message user';
-                userMsg.textContent = message;
-                messagesDiv.appendChild(userMsg);
-                messagesDiv.scrollTop = messagesDiv.scrollHeight;
-                
-                input.value = '';
-                
-                // Show thinking indicator
-                const thinkingMsg = document.createElement('div');
-                thinkingMsg.className = 'chat-message bot';
-                thinkingMsg.innerHTML = '<em>Thinking...</em>';
-                messagesDiv.appendChild(thinkingMsg);
-                messagesDiv.scrollTop = messagesDiv.scrollHeight;
-                
-                // Get response using smart keyword search
-                const answer = processQuery(message);
-                
-                // Replace thinking with actual response
-                thinkingMsg.innerHTML = answer;
-                messagesDiv.scrollTop = messagesDiv.scrollHeight;
-            }}
-            
-            function processQuery(query) {{
-                const q = query.toLowerCase().trim();
-                
-                // Statistics queries
-                if (q.includes('how many') || q.includes('total') || q.includes('count') || q.includes('stats')) {{
-                    let stats = `<strong>${{searchIndex.length}} crisis locations tracked</strong>:<br><br>`;
-                    Object.entries(categoryCounts).forEach(([cat, count]) => {{
-                        stats += `<strong>${{cat}}:</strong> ${{count}} locations<br>`;
-                    }});
-                    return stats;
-                }}
-                
-                // List all
-                if (q.includes('list') || q === 'all' || q.includes('show all')) {{
-                    let html = '<strong>Top crisis locations:</strong><br><br>';
-                    searchIndex.slice(0, 10).forEach((item, i) => {{
-                        html += `${{i+1}}. <strong>${{item.location}}</strong><br>`;
-                        html += `   ${{item.category}} (${{item.count}} incidents)<br>`;
-                    }});
-                    if (searchIndex.length > 10) {{
-                        html += `<br><em>+ ${{searchIndex.length - 10}} more locations</em>`;
-                    }}
-                    return html;
-                }}
-                
-                // Search for location or category
-                let searchTerm = q.replace(/^(show me|show|find|search|where is|what about|tell me about|whats in|what's in|what is happening in|what's happening in|whats happening in|what is going on in|what's going on in)\s+/i, '').trim();
-                let normalized = normalizeText(searchTerm);
-                // If user asked "... in X" or "... about X", grab X
-                const inIdx = normalized.lastIndexOf(' in ');
-                const aboutIdx = normalized.lastIndexOf(' about ');
-                const splitIdx = Math.max(inIdx, aboutIdx);
-                if (splitIdx > -1) {{
-                    normalized = normalized.substring(splitIdx + (inIdx > aboutIdx ? 4 : 7));
-                }}
-                // Trim trailing noise
-                normalized = normalized.replace(/\b(now|today|currently)\b$/,'').trim();
-                // Remove any trailing punctuation
-                normalized = normalized.replace(/[^a-z0-9 \-,]/gi, '').trim();
-                if (aliasMap[normalized]) {{
-                    normalized = aliasMap[normalized];
-                }}
-                // Try location match first
-                const locationMatches = searchIndex.filter(item =>
-                    normalizeText(item.location).includes(normalized)
-                );
-                
-                if (locationMatches.length > 0) {{
-                    const loc = locationMatches[0];
-                    if (mapInstance) {{
-                        mapInstance.setView([loc.lat, loc.lon], 8);
-                    }}
-                    let response = `<strong>${{loc.location}}</strong><br><br>`;
-                    response += `Category: ${{loc.category}}<br>`;
-                    response += `Incidents: ${{loc.count}}<br><br>`;
-                    response += `<em>Map zoomed to location</em>`;
-                    
-                    if (locationMatches.length > 1) {{
-                        response += `<br><br>Other matches: `;
-                        response += locationMatches.slice(1, 4).map(m => m.location.split(',')[0]).join(', ');
-                    }}
-                    return response;
-                }}
-
-                // Try category match
-                const categoryMatches = searchIndex.filter(item =>
-                    normalizeText(item.category).includes(normalized)
-                );
-                if (categoryMatches.length > 0) {{
-                    let html = `<strong>Found ${{categoryMatches.length}} ${{categoryMatches[0].category}} locations:</strong><br><br>`;
-                    categoryMatches.slice(0, 8).forEach((item, i) => {{
-                        html += `${{i+1}}. ${{item.location}} (${{item.count}} incidents)<br>`;
-                    }});
-                    if (categoryMatches.length > 8) {{
-                        html += `<br><em>+ ${{categoryMatches.length - 8}} more</em>`;
-                    }}
-                    return html;
-                }}
-                
-                // No matches
-                const examples = [
-                    searchIndex[0].location.split(',')[0],
-                    'humanitarian',
-                    'how many total',
-                    'list all'
-                ];
-                return `No results found for "${{query}}"<br><br>Try: "${{examples.join('", "')}}"`;
-            }}
-            
-            
-            function zoomToLocation(lat, lon) {{
-                if (mapInstance) {{
-                    mapInstance.setView([lat, lon], 8);
-                }}
-            }}
-        </script>
-        """
+            const searchIndex = {search_index_js};""" + _SIDEBAR_SCRIPT
         
         # Insert before closing body tag
+        with open(html_file, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        
         html_content = html_content.replace('</body>', f'{sidebar_ui}</body>')
         
         with open(html_file, 'w', encoding='utf-8') as f:
@@ -8,6 +8,7 @@ than zero-shot classification which was trained on mainstream news.
 
 import logging
 from typing import List, Dict, Tuple
+from .keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -100,21 +101,9 @@ class SimpleCrisisClassifier:
             'sudan': 'Humanitarian Crises',
             'haiti': 'Humanitarian Crises',
         }
-    
-    def classify_article(self, article: Dict) -> Dict:
-        """
-        Classify article using source + keywords (no LLM)
-        
-        Returns:
-            Classification result with category and confidence
-        """
-        text = f"{article.get('title', '')} {article.get('content', '')}".lower()
-        title = article.get('title', '').lower()
-        source_category = article.get('source_category', 'Mixed')
-        priority = article.get('priority', 'medium')
         
         # Exclude entertainment/celebrity/sports and soft-news content
-        exclusions = [
+        self.exclusions = [
             # entertainment/sports
             'singer', 'musician', 'artist', 'band', 'album', 'concert', 'tour',
             'celebrity', 'actor', 'actress', 'movie', 'film', 'hollywood',
@@ -131,16 +120,60 @@ class SimpleCrisisClassifier:
             'publication launch', 'new report available', 'press release about report'
         ]
         
+        # Generic publications/newsletters, matched against the title only
+        self.title_exclusions = [
+            'edition', 'newsletter', 'manifesto', 'podcast', 'webinar', 'opinion',
+            'op-ed', 'analysis', 'live blog', 'live updates', 'explainer',
+            'timeline', 'q&a'
+        ]
+        
+        # Terms that override the exclusions above
+        self.crisis_impact_terms = ['killed', 'died', 'deaths', 'injured', 'attack', 'bombing', 'war']
+        
+        # Freeze the keyword lists and record their sizes for score normalization
+        self.category_keywords = {
+            category: tuple(keywords)
+            for category, keywords in self.category_keywords.items()
+        }
+        self._category_sizes = {
+            category: len(keywords)
+            for category, keywords in self.category_keywords.items()
+        }
+        
+        # All text keywords share one automaton, labeled by what they signal
+        groups = dict(self.category_keywords)
+        groups['zone'] = self.crisis_zone_mapping.keys()
+        groups['exclusion'] = self.exclusions
+        groups['impact'] = self.crisis_impact_terms
+        self._matcher = KeywordMatcher(groups=groups)
+        self._title_exclusion_matcher = KeywordMatcher(self.title_exclusions)
+    
+    def classify_article(self, article: Dict) -> Dict:
+        """
+        Classify article using source + keywords (no LLM)
+        
+        Returns:
+            Classification result with category and confidence
+        """
+        # Lowercase title and content once and reuse them for every check
+        title = article.get('title', '').lower()
+        content = article.get('content', '')
+        text = f"{title} {content.lower()}" if content else title
+        source_category = article.get('source_category', 'Mixed')
+        priority = article.get('priority', 'medium')
+        
         # Exclude generic publications/newsletters
-        if any(term in title for term in ['edition', 'newsletter', 'manifesto', 'podcast', 'webinar', 'opinion', 'op-ed', 'analysis', 'live blog', 'live updates', 'explainer', 'timeline', 'q&a']):
+        if self._title_exclusion_matcher.search(title):
             return self._create_result(article, 'Unknown', 0.0, 'excluded_publication')
         
+        # One scan of the text finds every category, zone, exclusion and
+        # impact keyword at once
+        found = self._matcher.matches_by_label(text)
+        
         # If entertainment/sports indicators without clear crisis impact
-        if any(term in text for term in exclusions):
-            # Only allow if there's clear crisis impact
-            crisis_impact_terms = ['killed', 'died', 'deaths', 'injured', 'attack', 'bombing', 'war']
-            if not any(term in text for term in crisis_impact_terms):
-                return self._create_result(article, 'Unknown', 0.0, 'excluded_non_crisis')
+        # (only allow if there's clear crisis impact)
+        if 'exclusion' in found and 'impact' not in found:
+            return self._create_result(article, 'Unknown', 0.0, 'excluded_non_crisis')
         
         # Step 1: If source already categorized it (NGO/specialized feed)
         if source_category != 'Mixed':
@@ -148,24 +181,27 @@ class SimpleCrisisClassifier:
             return self._create_result(article, source_category, confidence, 'source_trust')
         
         # Step 2: Check for specific crisis zones (only for real crises)
-        for zone, category in self.crisis_zone_mapping.items():
-            if zone in text:
-                return self._create_result(article, category, 0.85, 'crisis_zone')
-        
-        # Step 3: Keyword matching for each category
-        category_scores = {}
-        category_match_counts = {}
-        for category, keywords in self.category_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text)
-            category_match_counts[category] = score
+        zones = found.get('zone')
+        if zones:
+            for zone, category in self.crisis_zone_mapping.items():
+                if zone in zones:
+                    return self._create_result(article, category, 0.85, 'crisis_zone')
+        
+        # Step 3: Keyword matching for each category, keeping the best
+        # (earliest on ties) as we go
+        top_category = None
+        top_score = 0.0
+        match_count = 0
+        for category, size in self._category_sizes.items():
+            score = len(found.get(category, ()))
             if score > 0:
                 # Normalize by keyword count
-                category_scores[category] = score / len(keywords)
+                normalized = score / size
+                if normalized > top_score:
+                    top_category, top_score, match_count = category, normalized, score
         
-        if category_scores:
-            top_category = max(category_scores, key=category_scores.get)
-            confidence = min(category_scores[top_category] * 2, 0.95)  # Scale up but cap
-            match_count = category_match_counts.get(top_category, 0)
+        if top_category is not None:
+            confidence = min(top_score * 2, 0.95)  # Scale up but cap
             
             # Additional gating for Human Rights Violations to avoid incidental mentions
             if top_category == 'Human Rights Violations' and match_count < 2:
@@ -211,6 +247,16 @@ class SimpleCrisisClassifier:
         }
 
 
+_classifier_instance = None
+
+def get_classifier_instance() -> SimpleCrisisClassifier:
+    """Get or create singleton classifier instance to reuse its keyword automaton"""
+    global _classifier_instance
+    if _classifier_instance is None:
+        _classifier_instance = SimpleCrisisClassifier()
+    return _classifier_instance
+
+
 def classify_crisis_articles(articles: List[Dict]) -> List[Dict]:
     """
     Classify articles using simple rule-based method
@@ -218,26 +264,28 @@ def classify_crisis_articles(articles: List[Dict]) -> List[Dict]:
     Returns:
         List of classification results
     """
-    classifier = SimpleCrisisClassifier()
+    classifier = get_classifier_instance()
     return classifier.classify_batch(articles)
 
 
 def get_crisis_summary(classified_articles: List[Dict]) -> Dict:
     """Generate summary statistics"""
-    crisis_articles = [r for r in classified_articles if r['is_crisis']]
-    
-    # Category distribution
+    # Category distribution, in a single pass over the results
     category_counts = {}
     total_confidence = 0.0
+    crisis_count = 0
     
-    for result in crisis_articles:
+    for result in classified_articles:
+        if not result['is_crisis']:
+            continue
         category = result['predicted_category']
         category_counts[category] = category_counts.get(category, 0) + 1
         total_confidence += result['confidence']
+        crisis_count += 1
     
     return {
         'total_articles': len(classified_articles),
-        'crisis_count': len(crisis_articles),
+        'crisis_count': crisis_count,
         'category_distribution': category_counts,
-        'average_confidence': total_confidence / len(crisis_articles) if crisis_articles else 0.0
+        'average_confidence': total_confidence / crisis_count if crisis_count else 0.0
     }
@@ -11,18 +11,21 @@ This script orchestrates the complete pipeline:
 """
 
 import argparse
+import heapq
 import logging
 import json
+import os
 import sys
 import time
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
 # Import ARGUS modules - Enhanced v2
+# (geo_extractor and mapper pull in spaCy and Folium, so they are imported
+# only once there are articles to process)
 from argus.rss_fetcher_v2 import fetch_crisis_news
 from argus.simple_classifier import classify_crisis_articles, get_crisis_summary
-from argus.geo_extractor import extract_article_locations
-from argus.mapper import create_crisis_visualization
 from argus.export_human_rights import export_human_rights_json
 from argus.config import OUTPUT_MAP_FILE
 
@@ -76,7 +79,11 @@ def run_crisis_monitor(hours_back: int = 168,
             logger.error("No articles found. Exiting pipeline.")
             return None
         
-        logger.info(f"Fetched {len(articles)} articles from {len(set(a['source_name'] for a in articles))} sources")
+        from argus.geo_extractor import extract_article_locations
+        from argus.mapper import create_crisis_visualization
+        
+        unique_sources = len(set(a.get('source_name', 'Unknown') for a in articles))
+        logger.info(f"Fetched {len(articles)} articles from {unique_sources} sources")
         
         # Step 2: Rule-Based Classification (No LLM)
         logger.info("Step 2: Classifying articles using rule-based classification...")
@@ -100,12 +107,11 @@ def run_crisis_monitor(hours_back: int = 168,
         crisis_article_list = [result['article'] for result in crisis_articles]
         enhanced_article_list = extract_article_locations(crisis_article_list)
         
-        # Combine classification and location data
-        enhanced_articles = []
-        for i, crisis_result in enumerate(crisis_articles):
-            enhanced_crisis_result = crisis_result.copy()
-            enhanced_crisis_result['article'] = enhanced_article_list[i]
-            enhanced_articles.append(enhanced_crisis_result)
+        # Combine classification and location data; nothing reads the
+        # un-geocoded articles again, so the results are updated in place
+        for crisis_result, enhanced_article in zip(crisis_articles, enhanced_article_list):
+            crisis_result['article'] = enhanced_article
+        enhanced_articles = crisis_articles
         
         # Filter to articles with geocoded locations, but be more flexible
         mappable_articles = [
@@ -148,13 +154,16 @@ def run_crisis_monitor(hours_back: int = 168,
         logger.info("Step 6: Generating summary report...")
         
         summary = generate_pipeline_summary(
-            articles, classification_results, enhanced_articles, mappable_articles
+            articles, classification_results, enhanced_articles, mappable_articles,
+            unique_sources=unique_sources
         )
         
-        # Save summary to file
+        # Save summary to file (via a temp file so readers never see a partial write)
         summary_file = "crisis_summary.json"
-        with open(summary_file, 'w', encoding='utf-8') as f:
+        tmp_file = f"{summary_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_file, summary_file)
         
         # Print summary to console
         print_pipeline_summary(summary)
@@ -169,19 +178,31 @@ def run_crisis_monitor(hours_back: int = 168,
         return map_file
         
     except Exception as e:
-        logger.error(f"Pipeline failed with error: {e}")
-        import traceback
-        logger.error(f"Traceback:\n{traceback.format_exc()}")
+        logger.exception(f"Pipeline failed with error: {e}")
         raise
 
 def generate_pipeline_summary(articles: list, 
                             classification_results: list,
                             enhanced_articles: list, 
-                            mappable_articles: list) -> dict:
+                            mappable_articles: list,
+                            unique_sources: int = None) -> dict:
     """Generate a comprehensive summary of the pipeline results"""
     
-    # Count unique sources
-    unique_sources = len(set(a.get('source_name', 'Unknown') for a in articles))
+    # Count unique sources (unless the caller already has)
+    if unique_sources is None:
+        unique_sources = len(set(a.get('source_name', 'Unknown') for a in articles))
+    
+    # Classification statistics (crisis count gathered in the same pass)
+    category_counts = {}
+    total_confidence = 0
+    crisis_count = 0
+    
+    for result in classification_results:
+        category = result.get('predicted_category', 'Unknown')
+        category_counts[category] = category_counts.get(category, 0) + 1
+        total_confidence += result.get('confidence', 0)
+        if result.get('is_crisis', False):
+            crisis_count += 1
     
     # Basic statistics
     summary = {
@@ -190,34 +211,29 @@ def generate_pipeline_summary(articles: list,
             'total_articles_fetched': len(articles),
             'unique_sources': unique_sources,
             'articles_classified': len(classification_results),
-            'crisis_articles_found': len([r for r in classification_results if r.get('is_crisis', False)]),
+            'crisis_articles_found': crisis_count,
             'mappable_crisis_articles': len(mappable_articles)
         }
     }
     
-    # Classification statistics
-    category_counts = {}
-    total_confidence = 0
-    
-    for result in classification_results:
-        category = result.get('predicted_category', 'Unknown')
-        category_counts[category] = category_counts.get(category, 0) + 1
-        total_confidence += result.get('confidence', 0)
-    
     summary['classification_stats'] = {
         'category_distribution': category_counts,
         'average_confidence': total_confidence / len(classification_results) if classification_results else 0
     }
     
-    # Geographic statistics
+    # Geographic statistics and top crisis locations, in one pass over the
+    # enhanced articles (mappable articles are a subset of them)
     total_locations = 0
     geocoded_locations = 0
     unique_countries = set()
+    location_counts = {}
+    mappable_ids = {id(result) for result in mappable_articles}
     
     for result in enhanced_articles:
         article = result['article']
         locations = article.get('locations', [])
         total_locations += len(locations)
+        is_mappable = id(result) in mappable_ids
         
         for location in locations:
             if location.get('geocoded', False):
@@ -227,9 +243,14 @@ def generate_pipeline_summary(articles: list,
                 # Ensure address is a string
                 if address and isinstance(address, str):
                     # Simple heuristic to extract country (last part of address)
-                    parts = address.split(', ')
-                    if parts:
-                        unique_countries.add(parts[-1])
+                    unique_countries.add(address.rpartition(', ')[2])
+                
+                if is_mappable:
+                    name = location.get('found_name', location.get('text', 'Unknown'))
+                    # Ensure name is a string
+                    if not isinstance(name, str):
+                        name = str(name) if name is not None else 'Unknown'
+                    location_counts[name] = location_counts.get(name, 0) + 1
     
     summary['geographic_stats'] = {
         'total_locations_extracted': total_locations,
@@ -240,18 +261,7 @@ def generate_pipeline_summary(articles: list,
     }
     
     # Top crisis locations
-    location_counts = {}
-    for result in mappable_articles:
-        article = result['article']
-        for location in article.get('locations', []):
-            if location.get('geocoded', False):
-                name = location.get('found_name', location.get('text', 'Unknown'))
-                # Ensure name is a string
-                if not isinstance(name, str):
-                    name = str(name) if name is not None else 'Unknown'
-                location_counts[name] = location_counts.get(name, 0) + 1
-    
-    top_locations = sorted(location_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    top_locations = heapq.nlargest(10, location_counts.items(), key=itemgetter(1))
     summary['top_crisis_locations'] = top_locations
     
     return summary
@@ -42,7 +42,7 @@ def test_imports():
     
     required_modules = [
         'pandas', 'numpy', 'requests', 
-        'spacy', 'geopy', 'folium', 'tqdm', 'bs4'
+        'spacy', 'geopy', 'folium', 'tqdm', 'ahocorasick'
     ]
     
     failed_imports = []